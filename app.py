@@ -5,12 +5,15 @@ import streamlit as st
 from carbon_calculator.user.user_view import user_view
 from carbon_calculator.admin.admin_view import admin_view
 from carbon_calculator.styles import styles
+from carbon_calculator.assets import load_icons
+from carbon_calculator.report_table import empty_table, reports_to_table
 
 # Initialize session state for database simulation
+# The store is a pyarrow Table with one row per report
 if "companies_data" not in st.session_state:
-    st.session_state.companies_data = []
+    st.session_state.companies_data = empty_table()
     with open('./learning/datas.json', 'r') as f:
-        st.session_state.companies_data = json.load(f)
+        st.session_state.companies_data = reports_to_table(json.load(f))
 
 # Page configuration
 st.set_page_config(
@@ -19,6 +22,9 @@ st.set_page_config(
 
 styles()
 
+# Load and encode the bundled icons once per process, before any view renders
+load_icons()
+
 # User/Admin Selection
 user_type = st.sidebar.selectbox("Select User Type", ["Company User", "Admin"])
 
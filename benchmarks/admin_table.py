@@ -0,0 +1,146 @@
+"""Compare the admin dashboard data path before and after the Arrow rewrite.
+
+Each (path, size) pair runs in a fresh subprocess so peak memory is not
+polluted by earlier runs. Time-to-render covers everything the server does
+before handing bytes to the browser: building the table, metrics, Streamlit's
+Arrow serialization of st.dataframe, the Plotly figure and its JSON, and the
+CSV download link. Each path starts from the session store it reads: a list
+of report dicts before, a report table after.
+
+Usage (from the repository root):
+    python -m benchmarks.admin_table --rows 100000 1000000
+"""
+import argparse
+import gc
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+import pyarrow.compute as pc
+from streamlit import dataframe_util
+from streamlit.elements.lib.pandas_styler_utils import marshall_styler
+from streamlit.errors import StreamlitAPIException
+from streamlit.proto.Arrow_pb2 import Arrow as ArrowProto
+
+from benchmarks.data import make_reports, make_table
+from carbon_calculator.report_table import (
+    EMISSION_COLUMNS,
+    table_to_pandas,
+    emissions_by_company,
+    table_to_csv,
+)
+
+DEFAULT_ROWS = [100_000, 1_000_000]
+PATHS = ["dataframe", "arrow"]
+
+
+def dataframe_path(reports, errors):
+    """The admin_view data path before the Arrow rewrite."""
+    df = pd.DataFrame(reports)
+    yield "build"
+    len(df["company_name"].unique())
+    df["total"].sum()
+    yield "metrics"
+    styler = df.style.format({column: "{:.2f}" for column in EMISSION_COLUMNS})
+    try:
+        marshall_styler(ArrowProto(), styler, "benchmark")
+    except StreamlitAPIException as e:
+        # st.dataframe refuses large Stylers; time the unstyled table instead
+        errors.append(str(e).split(".")[0])
+    dataframe_util.convert_anything_to_arrow_bytes(styler)
+    yield "dataframe"
+    fig = px.bar(
+        df,
+        x="company_name",
+        y=["energy_usage", "waste", "business_travel"],
+        barmode="stack",
+    )
+    pio.to_json(fig, validate=False)
+    yield "chart"
+    df.to_csv(index=False)
+    yield "csv"
+
+
+def arrow_path(table, errors):
+    """The current admin_view data path; the store is already the table."""
+    yield "build"
+    pc.count_distinct(table["company_name"]).as_py()
+    pc.sum(table["total"]).as_py()
+    yield "metrics"
+    dataframe_util.convert_arrow_table_to_arrow_bytes(table)
+    yield "dataframe"
+    fig = px.bar(
+        table_to_pandas(emissions_by_company(table)),
+        x="company_name",
+        y=["energy_usage", "waste", "business_travel"],
+        barmode="stack",
+    )
+    pio.to_json(fig, validate=False)
+    yield "chart"
+    table_to_csv(table)
+    yield "csv"
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(path, rows):
+    store = make_reports(rows) if path == "dataframe" else make_table(rows)
+    gc.collect()
+    baseline = peak_rss_mb()
+
+    result = {"path": path, "rows": rows, "steps": {}, "errors": []}
+    steps = dataframe_path if path == "dataframe" else arrow_path
+    start = last = time.perf_counter()
+    for step in steps(store, result["errors"]):
+        now = time.perf_counter()
+        result["steps"][step] = now - last
+        last = now
+    result["seconds"] = time.perf_counter() - start
+    result["peak_memory_mb"] = peak_rss_mb() - baseline
+    print(json.dumps(result))
+
+
+def run(rows):
+    results = []
+    for size in rows:
+        for path in PATHS:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.admin_table", "--worker", path, str(size)],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def report(results):
+    print(f"{'rows':>10} {'path':>10} {'seconds':>9} {'peak MB':>9}  steps")
+    for result in results:
+        steps = ", ".join(f"{step} {seconds:.2f}s" for step, seconds in result["steps"].items())
+        for error in result["errors"]:
+            steps += f"\n{'':>42}{error}"
+        print(
+            f"{result['rows']:>10} {result['path']:>10} "
+            f"{result['seconds']:>9.2f} {result['peak_memory_mb']:>9.1f}  {steps}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--worker", nargs=2, metavar=("PATH", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker[0], int(args.worker[1]))
+    else:
+        report(run(args.rows))
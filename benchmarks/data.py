@@ -0,0 +1,45 @@
+import random
+
+import pyarrow as pa
+
+from carbon_calculator.recompute import DEFAULT_CHUNK_SIZE, recompute_reports
+from carbon_calculator.report_table import empty_table, reports_to_table
+
+COMPANY_COUNT = 1_000
+
+
+def make_reports(rows, seed=0, first_id=0):
+    """Build synthetic report dicts with raw inputs, like the ones user_view stores."""
+    rng = random.Random(seed)
+    reports = [
+        {
+            "id": str(first_id + i),
+            "company_name": f"Company {rng.randrange(COMPANY_COUNT)}",
+            "date": f"2023-{rng.randint(1, 12)}-{rng.randint(1, 28)}",
+            "electricity_bill": rng.uniform(500, 50_000),
+            "natural_gas_bill": rng.uniform(10, 10_000),
+            "fuel_bill": rng.uniform(500, 50_000),
+            "waste_per_month": rng.uniform(100, 10_000),
+            "recycling_percent": rng.randint(20, 60),
+            "distance_km": rng.uniform(10_000, 200_000),
+            "fuel_efficiency": rng.uniform(5, 15),
+        }
+        for i in range(rows)
+    ]
+    # Reports without a formula_version are stale, so this fills in the results
+    for table, _, _ in recompute_reports(reports_to_table(reports)):
+        pass
+    return table.to_pylist()
+
+
+def make_table(rows, seed=0, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Build a report table of synthetic reports, like the admin_view store.
+
+    Reports are generated a chunk at a time, so the dicts for all rows never
+    exist at once and do not inflate peak memory.
+    """
+    chunks = [
+        reports_to_table(make_reports(min(chunk_size, rows - start), seed + start, start))
+        for start in range(0, rows, chunk_size)
+    ]
+    return pa.concat_tables([empty_table(), *chunks]).combine_chunks()
@@ -0,0 +1,317 @@
+"""Measure rerun latency per widget interaction, before and after fragments.
+
+Each interaction is timed in two trees: the current one, and a baseline
+revision (by default the root commit, before the views were split into
+fragments). Each tree runs in its own subprocess, with the tree as working
+directory since app.py loads ./learning/datas.json.
+
+AppTest on its own reruns the whole script on every run. Here it is driven
+the way the browser drives Streamlit instead: fragments are kept between
+runs, and changing a widget that was rendered inside a fragment reruns only
+that fragment, with the fragment id read from the widget's delta just like
+the frontend does. So each timing is what the server actually does for the
+interaction in that tree.
+
+Input interactions are also timed with results shown, right after a
+Calculate click. clear_results() then adds a full app rerun to the fragment
+run, so those rows show the cost of hiding the results.
+
+Usage (from the repository root):
+    python -m benchmarks.reruns --repeat 20
+    python -m benchmarks.reruns --baseline <revision>
+"""
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from functools import partial
+from unittest import mock
+
+from streamlit.proto.WidgetStates_pb2 import WidgetStates
+from streamlit.runtime.fragment import MemoryFragmentStorage
+from streamlit.runtime.scriptrunner import ScriptRunnerEvent
+from streamlit.testing.v1 import AppTest, app_test
+from streamlit.testing.v1.element_tree import Widget, get_widget_state
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+TIMEOUT = 60
+DEFAULT_REPEAT = 20
+
+# Reports with raw inputs but no formula_version, so the admin view offers to
+# recompute them
+STALE_REPORTS = 1_000
+
+
+class MissingInteraction(Exception):
+    """Raised when the tree under test does not have the interaction."""
+
+
+class _Runner(LocalScriptRunner):
+    """A LocalScriptRunner that shares fragments between runs and can run one."""
+
+    def __init__(self, fragment_storage, fragment_id, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._fragment_storage = fragment_storage
+        self._fragment_id = fragment_id
+
+    def request_rerun(self, rerun_data):
+        if self._fragment_id:
+            rerun_data = dataclasses.replace(
+                rerun_data, fragment_id_queue=[self._fragment_id], is_fragment_scoped_rerun=True
+            )
+        return super().request_rerun(rerun_data)
+
+
+class Browser:
+    """Drive the app like one browser tab."""
+
+    def __init__(self, app):
+        self.at = AppTest.from_file(app, default_timeout=TIMEOUT)
+        self.fragment_storage = MemoryFragmentStorage()
+        # Latest widget per id, and the fragment each widget was rendered in
+        self.widgets = {}
+        self.fragments = {}
+        # What the last run executed, e.g. "fragment+app" when a fragment
+        # called st.rerun(scope="app")
+        self.script_runs = ""
+        self.run()
+
+    def _make_runner(self, fragment_id, *args, **kwargs):
+        self.runner = _Runner(self.fragment_storage, fragment_id, *args, **kwargs)
+        return self.runner
+
+    def run(self, changed=None):
+        """Run the app after `changed` was set, and return the errors it rendered.
+
+        Only the fragment holding the changed widget reruns, or the whole
+        script when the widget is not in a fragment.
+        """
+        fragment_id = self.fragments.get(changed.id) if changed else None
+        widget_states = WidgetStates()
+        widget_states.widgets.extend(get_widget_state(w) for w in self.widgets.values())
+
+        with mock.patch.object(app_test, "LocalScriptRunner", partial(self._make_runner, fragment_id)):
+            self.at._run(widget_states)
+        self.script_runs = "+".join(
+            "fragment" if data["fragment_ids_this_run"] else "app"
+            for event, data in zip(self.runner.events, self.runner.event_data)
+            if event == ScriptRunnerEvent.SCRIPT_STARTED
+        )
+
+        for msg in self.runner.forward_msgs():
+            if msg.WhichOneof("type") != "delta" or not msg.delta.HasField("new_element"):
+                continue
+            element = msg.delta.new_element
+            widget_id = getattr(getattr(element, element.WhichOneof("type")), "id", None)
+            if widget_id:
+                self.fragments[widget_id] = msg.delta.fragment_id
+        # A fragment run only sends its own elements, keep the other widgets
+        if not fragment_id:
+            self.widgets = {}
+        for node in self.at._tree:
+            if isinstance(node, Widget):
+                self.widgets[node.id] = node
+        return [e.message for e in self.at.exception]
+
+    def widget(self, kind, label):
+        for widget in self.widgets.values():
+            if widget.type == kind and widget.label == label:
+                return widget
+        raise MissingInteraction(f"no {kind} labelled {label!r}")
+
+    def set(self, kind, label, value):
+        widget = self.widget(kind, label)
+        widget.set_value(value)
+        return self.run(widget)
+
+    def click(self, label):
+        widget = self.widget("button", label)
+        widget.click()
+        return self.run(widget)
+
+
+def _fill_inputs(browser):
+    browser.set("text_input", "Company Name", "Benchmark Company")
+    for label, value in [
+        ("Monthly Electricity Bill (€)", 1200.0),
+        ("Monthly Natural Gas Bill (€)", 300.0),
+        ("Monthly Fuel Bill (€)", 900.0),
+        ("Monthly Waste Generated (kg)", 500.0),
+        ("Distance Traveled (km)", 5000.0),
+    ]:
+        browser.set("number_input", label, value)
+
+
+def _show_results(browser):
+    browser.click("Calculate Carbon Footprint")
+
+
+def _stale_reports(store):
+    """Return the report store with STALE_REPORTS stale reports appended."""
+    # Imported from the tree under test; trees without the module predate
+    # recomputing, so the interaction does not exist there
+    try:
+        from carbon_calculator.report_table import append_report
+    except ImportError as e:
+        raise MissingInteraction(str(e))
+
+    for i in range(STALE_REPORTS):
+        store = append_report(
+            store,
+            {
+                "id": f"stale-{i}",
+                "company_name": f"Company {i % 100}",
+                "date": "2023-1-1",
+                "electricity_bill": 1200.0,
+                "natural_gas_bill": 300.0,
+                "fuel_bill": 900.0,
+                "waste_per_month": 500.0,
+                "recycling_percent": 30,
+                "distance_km": 5000.0,
+                "fuel_efficiency": 8.0,
+            },
+        )
+    return store
+
+
+def _open_admin(browser):
+    browser.set("selectbox", "Select User Type", "Admin")
+    browser.stale_store = _stale_reports(browser.at.session_state.companies_data)
+    browser.at.session_state.companies_data = browser.stale_store
+    browser.run()
+
+
+def _reset_stale_reports(browser):
+    browser.at.session_state.companies_data = browser.stale_store
+
+
+def _input(kind, label, value):
+    return lambda browser, i: browser.set(kind, label, value(i))
+
+
+# Interaction name, setup before timing, setup before every timed run, and the
+# timed interaction, called with the iteration number
+INPUTS = [
+    ("company name", _input("text_input", "Company Name", lambda i: f"Company {i}")),
+    ("electricity bill", _input("number_input", "Monthly Electricity Bill (€)", lambda i: 1000.0 + i)),
+    ("recycling slider", _input("slider", "Recycling Percentage", lambda i: i % 100)),
+    ("fuel efficiency", _input("number_input", "Fuel Efficiency (L/100km)", lambda i: 5.0 + i)),
+]
+INTERACTIONS = [
+    *((name, _fill_inputs, None, interact) for name, interact in INPUTS),
+    *((f"{name}, results shown", _fill_inputs, _show_results, interact) for name, interact in INPUTS),
+    ("calculate", _fill_inputs, None, lambda browser, i: browser.click("Calculate Carbon Footprint")),
+    (
+        "admin recompute",
+        _open_admin,
+        _reset_stale_reports,
+        lambda browser, i: browser.click("Recompute outdated reports"),
+    ),
+]
+
+
+def time_interaction(app, setup, before_each, interact, repeat):
+    """Return the median seconds of an interaction, the script runs it caused
+    and the errors it rendered, or None if the tree lacks the interaction.
+    """
+    browser = Browser(app)
+    try:
+        setup(browser)
+    except MissingInteraction:
+        return None
+    timings = []
+    script_runs = set()
+    errors = set()
+    for i in range(repeat):
+        if before_each:
+            before_each(browser)
+        start = time.perf_counter()
+        errors.update(interact(browser, i))
+        timings.append(time.perf_counter() - start)
+        script_runs.add(browser.script_runs)
+    return {
+        "seconds": statistics.median(timings),
+        "script_runs": sorted(script_runs),
+        "errors": sorted(errors),
+    }
+
+
+def run_worker(repeat):
+    """Time every interaction in the tree in the working directory."""
+    # Streamlit warns on every session state and element call outside
+    # `streamlit run`, which would bury the results
+    logging.disable(logging.WARNING)
+    app = os.path.abspath("app.py")
+    results = {
+        name: time_interaction(app, setup, before_each, interact, repeat)
+        for name, setup, before_each, interact in INTERACTIONS
+    }
+    print(json.dumps(results))
+
+
+def _git(*args):
+    return subprocess.run(["git", *args], capture_output=True, check=True).stdout
+
+
+def _measure_tree(tree, repeat):
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", "--repeat", str(repeat)],
+        cwd=tree,
+        env={**os.environ, "PYTHONPATH": tree},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run(repeat, baseline):
+    tree = _git("rev-parse", "--show-toplevel").decode().strip()
+    with tempfile.TemporaryDirectory() as baseline_tree:
+        with tempfile.TemporaryFile() as archive:
+            archive.write(_git("archive", "--format=tar", baseline))
+            archive.seek(0)
+            with tarfile.open(fileobj=archive) as tar:
+                tar.extractall(baseline_tree, filter="data")
+        before = _measure_tree(baseline_tree, repeat)
+    after = _measure_tree(tree, repeat)
+    return [(name, before[name], after[name]) for name, *_ in INTERACTIONS]
+
+
+def report(results, baseline):
+    def ms(result):
+        return "n/a" if result is None else f"{result['seconds'] * 1000:.1f}"
+
+    def runs(result):
+        return "" if result is None else ", ".join(result["script_runs"])
+
+    print(f"Median time per interaction, before is {baseline}\n")
+    print(f"{'interaction':<34} {'before ms':>10} {'after ms':>10}  {'before runs':<14} after runs")
+    for name, before, after in results:
+        print(f"{name:<34} {ms(before):>10} {ms(after):>10}  {runs(before):<14} {runs(after)}")
+        for when, result in (("before", before), ("after", after)):
+            for error in result["errors"] if result else []:
+                print(f"{'':>4}{when} rendered an error: {error.splitlines()[0]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument(
+        "--baseline", help="revision to measure as before (default: the root commit)"
+    )
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.repeat)
+    else:
+        baseline = args.baseline or _git("rev-list", "--max-parents=0", "HEAD").decode().split()[0]
+        report(run(args.repeat, baseline), baseline)
@@ -0,0 +1,351 @@
+"""Performance regression suite for the carbon_calculator package.
+
+Every case runs at several data sizes. Results can be saved as a JSON
+baseline, and compare mode re-runs the suite and fails on any case whose best
+time grew by more than the threshold, or that the baseline has but the
+current run skipped or lacks. Everything runs offline.
+
+Usage (from the repository root):
+    python -m benchmarks.suite run --output benchmarks/baseline.json
+    python -m benchmarks.suite compare benchmarks/baseline.json --sizes 1000 10000 --threshold 0.2
+"""
+import argparse
+import datetime
+import json
+import logging
+import platform
+import sys
+import timeit
+
+import pandas as pd
+import streamlit as st
+
+from benchmarks.data import make_reports, make_table
+from carbon_calculator.calculator import (
+    calculate_CO2_from_energy_usage,
+    calculate_CO2_from_waste,
+    calculate_CO2_from_business_travel,
+)
+from carbon_calculator.recompute import INPUT_COLUMNS
+from carbon_calculator.report_table import (
+    reports_to_table,
+    append_report,
+    table_to_pandas,
+    emissions_by_company,
+)
+from carbon_calculator.admin.admin_view import company_comparison_chart
+from carbon_calculator.user.user_view import emissions_pie_chart
+from carbon_calculator.user.generate_suggestions import generate_suggestions
+from carbon_calculator.user.validate_inputs import validate_inputs
+from carbon_calculator.utils import get_csv_download_link, get_image_download_link, download_data_button
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.2
+
+# name -> (setup, sizes). setup(size) returns the zero-argument callable to time,
+# sizes of None means the case does not depend on data size
+CASES = {}
+
+
+class SkipCase(Exception):
+    """Raised by a setup when the case cannot run in this environment."""
+
+
+def case(name, sizes=DEFAULT_SIZES):
+    def register(setup):
+        CASES[name] = (setup, sizes)
+        return setup
+
+    return register
+
+
+def _input_arrays(size):
+    frame = pd.DataFrame.from_records(make_reports(size), columns=INPUT_COLUMNS)
+    return {column: frame[column].to_numpy(dtype=float) for column in INPUT_COLUMNS}
+
+
+# Calculator functions, vectorized the way the recompute engine calls them
+@case("calculator.energy_usage")
+def _(size):
+    a = _input_arrays(size)
+    return lambda: calculate_CO2_from_energy_usage(
+        a["electricity_bill"], a["natural_gas_bill"], a["fuel_bill"]
+    )
+
+
+@case("calculator.waste")
+def _(size):
+    a = _input_arrays(size)
+    return lambda: calculate_CO2_from_waste(a["waste_per_month"], a["recycling_percent"])
+
+
+@case("calculator.business_travel")
+def _(size):
+    a = _input_arrays(size)
+    return lambda: calculate_CO2_from_business_travel(a["distance_km"], a["fuel_efficiency"])
+
+
+# One call per report, as the user view does after each calculation
+@case("suggestions.generate_suggestions")
+def _(size):
+    reports = make_reports(size)
+
+    def run():
+        for r in reports:
+            generate_suggestions(
+                r["energy_usage"],
+                r["waste"],
+                r["business_travel"],
+                r["electricity_bill"],
+                r["natural_gas_bill"],
+                r["fuel_bill"],
+                r["waste_per_month"],
+                r["recycling_percent"],
+            )
+
+    return run
+
+
+@case("validation.validate_inputs")
+def _(size):
+    # Incomplete inputs, so every check runs and most of them report an error
+    inputs = {
+        "company_name": "",
+        "electricity_bill_input": 0.0,
+        "natural_gas_bill_input": 0.0,
+        "fuel_bill_input": 0.0,
+        "waste_per_month_input": 0.0,
+        "distance_km_input": 0.0,
+        "fuel_efficiency_input": 8.0,
+    }
+    for key, value in inputs.items():
+        st.session_state[key] = value
+
+    def run():
+        for _ in range(size):
+            validate_inputs()
+
+    return run
+
+
+# Admin dashboard data and aggregates
+@case("admin.reports_to_table")
+def _(size):
+    reports = make_reports(size)
+    return lambda: reports_to_table(reports)
+
+
+# One call per calculation, as the user view adds its report to the store
+@case("admin.append_report")
+def _(size):
+    table = make_table(size)
+    report = make_reports(1)[0]
+    return lambda: append_report(table, report)
+
+
+@case("admin.emissions_by_company")
+def _(size):
+    table = make_table(size)
+    return lambda: emissions_by_company(table)
+
+
+@case("admin.table_to_pandas")
+def _(size):
+    table = make_table(size)
+    return lambda: table_to_pandas(table)
+
+
+# Chart figures
+@case("charts.company_comparison_chart")
+def _(size):
+    table = make_table(size)
+    return lambda: company_comparison_chart(table)
+
+
+@case("charts.emissions_pie_chart", sizes=None)
+def _(size):
+    return lambda: emissions_pie_chart("Company", 1200.0, 800.0, 400.0)
+
+
+# Exports
+@case("export.get_csv_download_link")
+def _(size):
+    df = pd.DataFrame.from_records(make_reports(size))
+    return lambda: get_csv_download_link(df, "report.csv", icon="square.and.arrow.down", text="CSV")
+
+
+@case("export.download_data_button")
+def _(size):
+    table = make_table(size)
+    return lambda: download_data_button(table)
+
+
+def _pdf_export_unavailable():
+    """Return why kaleido cannot export figures here, or None if it can."""
+    try:
+        import kaleido  # noqa: F401
+    except ImportError:
+        return "kaleido is not installed"
+    # plotly 5 leaves its kaleido scope unset when the installed kaleido
+    # release does not provide the API it expects
+    from plotly.io import _kaleido
+
+    if getattr(_kaleido, "scope", True) is None:
+        return "the installed kaleido is not compatible with plotly"
+    return None
+
+
+@case("export.get_image_download_link", sizes=None)
+def _(size):
+    reason = _pdf_export_unavailable()
+    if reason:
+        raise SkipCase(f"PDF export unavailable: {reason}")
+    fig = emissions_pie_chart("Company", 1200.0, 800.0, 400.0)
+
+    def run():
+        get_image_download_link(fig, "chart", icon="square.and.arrow.down", text="PDF")
+
+    try:
+        run()
+    except Exception as e:
+        # Newer kaleido releases drive a local Chrome; not finding or starting
+        # it is an environment problem, anything else is a real failure
+        if type(e).__module__.split(".")[0] not in ("kaleido", "choreographer"):
+            raise
+        raise SkipCase(f"PDF export unavailable: {type(e).__name__}: {e}")
+    return run
+
+
+def measure(fn, repeat):
+    """Time fn like timeit: loop enough calls per sample to rise above timer noise."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    timings = [total / number for total in timer.repeat(repeat, number)]
+    return {"best": min(timings), "worst": max(timings), "number": number}
+
+
+def run(sizes, repeat, selected=None):
+    results = {}
+    skipped = {}
+    for name, (setup, case_sizes) in CASES.items():
+        if selected and not any(name.startswith(prefix) for prefix in selected):
+            continue
+        keys = [(size, f"{name}[{size}]") for size in sizes] if case_sizes else [(None, name)]
+        for i, (size, key) in enumerate(keys):
+            try:
+                fn = setup(size)
+            except SkipCase as e:
+                # The remaining sizes would skip for the same reason; record
+                # each of them so compare reports why they were not run
+                skipped.update((remaining, str(e)) for _, remaining in keys[i:])
+                break
+            results[key] = {"case": name, "size": size, **measure(fn, repeat)}
+            print(f"{key:<50} {results[key]['best'] * 1000:>10.3f} ms", file=sys.stderr)
+    for key, reason in skipped.items():
+        print(f"{key:<50} skipped: {reason}", file=sys.stderr)
+
+    return {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "sizes": sizes,
+            "cases": selected,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(baseline, current, threshold):
+    """Return (key, baseline, current, change) rows, the regressed keys and lost keys.
+
+    Best times are compared, since slower samples mostly measure other load
+    on the machine rather than the code. A baseline case that the current
+    run selected but did not time, because it was skipped or no longer
+    exists, is lost coverage and maps to the reason.
+    """
+    rows = []
+    regressions = []
+    for key, result in current["results"].items():
+        if key not in baseline["results"]:
+            rows.append((key, None, result["best"], None))
+            continue
+        before = baseline["results"][key]["best"]
+        change = result["best"] / before - 1
+        rows.append((key, before, result["best"], change))
+        if change > threshold:
+            regressions.append(key)
+
+    selected = current["meta"]["cases"]
+    sizes = current["meta"]["sizes"]
+    lost = {}
+    for key, result in baseline["results"].items():
+        if key in current["results"]:
+            continue
+        if selected and not any(result["case"].startswith(prefix) for prefix in selected):
+            continue
+        if result["size"] is not None and result["size"] not in sizes:
+            continue
+        lost[key] = current["skipped"].get(key, "missing from the current run")
+    return rows, regressions, lost
+
+
+def report(rows, regressions, lost, threshold):
+    print(f"{'case':<50} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    for key, before, after, change in rows:
+        before_ms = "new" if before is None else f"{before * 1000:.3f}"
+        change_pct = "" if change is None else f"{change:+.0%}"
+        flag = "  REGRESSION" if key in regressions else ""
+        print(f"{key:<50} {before_ms:>12} {after * 1000:>12.3f} {change_pct:>8}{flag}")
+    for key, reason in lost.items():
+        print(f"{key:<50} NOT RUN: {reason}")
+    print(f"\n{len(regressions)} regression(s) above {threshold:.0%}, {len(lost)} baseline case(s) not run")
+
+
+def main():
+    # Options shared by both commands. They follow the command, since
+    # --sizes and --cases take several values and would swallow it
+    suite_options = argparse.ArgumentParser(add_help=False)
+    suite_options.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    suite_options.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    suite_options.add_argument("--cases", nargs="+", help="only run cases starting with these prefixes")
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser(
+        "run", parents=[suite_options], help="run the suite and optionally save a baseline"
+    )
+    run_parser.add_argument("--output", help="write results to this JSON file")
+    compare_parser = commands.add_parser(
+        "compare", parents=[suite_options], help="run the suite and compare to a baseline"
+    )
+    compare_parser.add_argument("baseline", help="JSON file written by 'run --output'")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    # Streamlit warns on every session state and element call outside
+    # `streamlit run` and resets its own log levels, so disable them globally
+    logging.disable(logging.WARNING)
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        current = run(args.sizes, args.repeat, args.cases)
+        rows, regressions, lost = compare(baseline, current, args.threshold)
+        report(rows, regressions, lost, args.threshold)
+        return 1 if regressions or lost else 0
+
+    results = run(args.sizes, args.repeat, args.cases)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
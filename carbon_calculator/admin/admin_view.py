@@ -1,41 +1,61 @@
 import streamlit as st
-import pandas as pd
+import pyarrow.compute as pc
 import plotly.express as px
 
 from carbon_calculator.utils import label, download_data_button
+from carbon_calculator.recompute import find_stale_reports, recompute_reports
+from carbon_calculator.report_table import (
+    EMISSION_COLUMNS,
+    drop_empty_columns,
+    table_to_pandas,
+    emissions_by_company,
+)
+
+def company_comparison_chart(table):
+    # Stacked bars already add up per company, so plot the per-company sums
+    return px.bar(
+        table_to_pandas(emissions_by_company(table)),
+        x="company_name",
+        y=["energy_usage", "waste", "business_travel"],
+        title="Emissions by Company",
+        labels={"value": "Emissions (kgCO2)", "company_name": "Company"},
+        barmode="stack",
+    )
+
 
 def admin_view():
     st.markdown(label(icon="person.badge.key", title="Admin Dashboard"), unsafe_allow_html=True)
 
-    if not st.session_state.companies_data:
+    if not st.session_state.companies_data.num_rows:
         st.warning("No company data available yet.")
     else:
-        # Convert session state data to DataFrame
-        df = pd.DataFrame(st.session_state.companies_data)
+        outdated_reports()
+
+        # The store is already an Arrow table; it stays columnar all the way
+        # to Streamlit's Arrow serialization
+        table = st.session_state.companies_data
 
         # Overview metrics
         st.markdown("<div class='admin-card'>", unsafe_allow_html=True)
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Companies", len(df["company_name"].unique()))
+            st.metric("Total Companies", pc.count_distinct(table["company_name"]).as_py())
         with col2:
-            st.metric("Total Reports", len(df))
+            st.metric("Total Reports", table.num_rows)
         with col3:
-            st.metric("Total Emissions", f"{df['total'].sum():.2f} kgCO2")
+            st.metric("Total Emissions", f"{pc.sum(table['total']).as_py():.2f} kgCO2")
         st.markdown("</div>", unsafe_allow_html=True)
 
         # Historical Data
         st.markdown("<div class='admin-card'>", unsafe_allow_html=True)
         st.markdown(label(icon="chart.line.uptrend.xyaxis", title="Historical Data", is_subheader=True), unsafe_allow_html=True)
+        # Show the same columns as the downloaded CSV
         st.dataframe(
-            df.style.format(
-                {
-                    "energy_usage": "{:.2f}",
-                    "waste": "{:.2f}",
-                    "business_travel": "{:.2f}",
-                    "total": "{:.2f}",
-                }
-            ),
+            drop_empty_columns(table),
+            column_config={
+                column: st.column_config.NumberColumn(format="%.2f")
+                for column in EMISSION_COLUMNS
+            },
             use_container_width=True,
         )
         st.markdown("</div>", unsafe_allow_html=True)
@@ -43,16 +63,28 @@ def admin_view():
         # Company Comparison
         st.markdown("<div class='admin-card'>", unsafe_allow_html=True)
         st.markdown(label(icon="magnifyingglass.circle", title="Company Comparison", is_subheader=True), unsafe_allow_html=True)
-        fig = px.bar(
-            df,
-            x="company_name",
-            y=["energy_usage", "waste", "business_travel"],
-            title="Emissions by Company",
-            labels={"value": "Emissions (kgCO2)", "company_name": "Company"},
-            barmode="stack",
-        )
+        fig = company_comparison_chart(table)
         st.plotly_chart(fig, use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
 
         # Download complete dataset
-        download_data_button(df)
\ No newline at end of file
+        download_data_button(table)
+
+
+# A fragment, so clicking the button does not rebuild the dashboard below
+# until the recompute has actually changed the data
+@st.fragment
+def outdated_reports():
+    recomputable, unrecoverable = find_stale_reports(st.session_state.companies_data)
+    if len(recomputable):
+        st.warning(f"{len(recomputable)} reports were computed with outdated formulas.")
+        if st.button("Recompute outdated reports", key="recompute"):
+            progress = st.progress(0.0, text="Recomputing reports...")
+            for table, done, total in recompute_reports(st.session_state.companies_data):
+                st.session_state.companies_data = table
+                progress.progress(done / total, text=f"Recomputed {done} of {total} reports")
+            st.rerun()
+    if len(unrecoverable):
+        st.info(
+            f"{len(unrecoverable)} reports have no stored inputs and cannot be recomputed."
+        )
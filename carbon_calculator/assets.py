@@ -0,0 +1,47 @@
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+import base64
+
+ICONS_DIR = Path(__file__).resolve().parent.parent / "Icons"
+
+# Icons render at most 40px high, keep twice that for high-DPI screens
+ICON_MAX_HEIGHT = 80
+
+# Downscale and recompress icons when loading them; set to False to inline
+# the bundled files unchanged
+OPTIMIZE_ICONS = True
+
+
+def _optimize_png(data):
+    """Downscale and recompress a PNG, keeping the original if that is smaller."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return data
+
+    image = Image.open(BytesIO(data))
+    if image.height > ICON_MAX_HEIGHT:
+        width = round(image.width * ICON_MAX_HEIGHT / image.height)
+        image = image.resize((width, ICON_MAX_HEIGHT), Image.LANCZOS)
+    buf = BytesIO()
+    image.save(buf, format="PNG", optimize=True)
+    optimized = buf.getvalue()
+    return optimized if len(optimized) < len(data) else data
+
+
+@lru_cache(maxsize=None)
+def load_icons():
+    """Read every bundled icon once and return them as inline data URIs by name."""
+    icons = {}
+    for path in sorted(ICONS_DIR.glob("*.png")):
+        data = path.read_bytes()
+        if OPTIMIZE_ICONS:
+            data = _optimize_png(data)
+        icons[path.stem] = f"data:image/png;base64,{base64.b64encode(data).decode()}"
+    return icons
+
+
+def icon_src(icon):
+    """Return the cached inline src for an icon in Icons/, e.g. icon_src("leaf")."""
+    return load_icons()[icon]
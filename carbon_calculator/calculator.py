@@ -1,3 +1,19 @@
+# Formula versioning
+# Bump FORMULA_VERSION whenever a calculation below changes and record which
+# derived columns it affects, so stored reports can be recomputed selectively.
+FORMULA_VERSION = 1
+FORMULA_CHANGES = {
+    1: ("energy_usage", "waste", "business_travel"),
+}
+
+def stale_columns(formula_version):
+    """Return the derived columns whose formulas changed after formula_version."""
+    columns = []
+    for version, changed in FORMULA_CHANGES.items():
+        if version > formula_version:
+            columns.extend(column for column in changed if column not in columns)
+    return columns
+
 # Calculation functions
 def calculate_CO2_from_energy_usage(electricity_bill, natural_gas_bill, fuel_bill):
     CO2_from_electricity_usage = electricity_bill * 12 * 0.0005
@@ -13,4 +29,4 @@ def calculate_CO2_from_waste(waste_per_month, recycling_percent):
     return waste_per_month * 12 * 0.57 - recycling_percent
 
 def calculate_CO2_from_business_travel(distance_km, fuel_efficiency):
-    return distance_km * 1 / fuel_efficiency * 2.31
\ No newline at end of file
+    return distance_km * 1 / fuel_efficiency * 2.31
@@ -0,0 +1,81 @@
+import pandas as pd
+import pyarrow as pa
+
+from carbon_calculator.recompute import INPUT_COLUMNS
+
+EMISSION_COLUMNS = ["energy_usage", "waste", "business_travel", "total"]
+
+# The recycling slider only takes whole percentages
+INTEGER_INPUT_COLUMNS = {"recycling_percent"}
+
+# Explicit schema so columns never fall back to object dtype or get inferred
+# as null when every stored report is missing a value
+REPORT_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("company_name", pa.string()),
+        ("date", pa.string()),
+        *((column, pa.float64()) for column in EMISSION_COLUMNS),
+        *(
+            (column, pa.int64() if column in INTEGER_INPUT_COLUMNS else pa.float64())
+            for column in INPUT_COLUMNS
+        ),
+        ("formula_version", pa.int64()),
+    ]
+)
+
+
+# Appending a report adds a chunk to every column; merge them past this many
+MAX_CHUNKS = 64
+
+
+def reports_to_table(reports):
+    """Convert report dicts into a report table.
+
+    This parses the dicts row by row, so use it to load reports into the
+    store, not on every render.
+    """
+    return pa.Table.from_pylist(reports, schema=REPORT_SCHEMA)
+
+
+def empty_table():
+    """Return a report table with no reports."""
+    return REPORT_SCHEMA.empty_table()
+
+
+def append_report(table, report):
+    """Return the report table with one report dict appended."""
+    table = pa.concat_tables([table, reports_to_table([report])])
+    if table.column(0).num_chunks > MAX_CHUNKS:
+        table = table.combine_chunks()
+    return table
+
+
+def table_to_pandas(table):
+    """Wrap an Arrow table in a DataFrame backed by Arrow dtypes, without copying."""
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def emissions_by_company(table):
+    """Sum emissions per company, keeping companies in order of first appearance."""
+    aggregated = table.group_by("company_name", use_threads=False).aggregate(
+        [(column, "sum") for column in EMISSION_COLUMNS]
+    )
+    return aggregated.rename_columns(
+        [name.removesuffix("_sum") for name in aggregated.column_names]
+    )
+
+
+def drop_empty_columns(table):
+    """Leave out columns that are empty for every report.
+
+    These are the raw inputs when only legacy reports are stored.
+    """
+    return table.select(
+        [name for name in table.column_names if table[name].null_count < table.num_rows]
+    )
+
+
+def table_to_csv(table):
+    """Write the table as CSV text in the same format as pandas.to_csv."""
+    return table_to_pandas(drop_empty_columns(table)).to_csv(index=False)
@@ -4,10 +4,49 @@ import pandas as pd
 import datetime
 import uuid
 
-from carbon_calculator.calculator import calculate_CO2_from_energy_usage, calculate_CO2_from_waste, calculate_CO2_from_business_travel
+from carbon_calculator.calculator import FORMULA_VERSION, calculate_CO2_from_energy_usage, calculate_CO2_from_waste, calculate_CO2_from_business_travel
 from carbon_calculator.utils import label, get_csv_download_link, get_image_download_link
 from carbon_calculator.user.generate_suggestions import display_suggestions, generate_suggestions
 from carbon_calculator.user.validate_inputs import validate_inputs
+from carbon_calculator.report_table import append_report, empty_table
+
+# Create pie chart using Plotly
+def emissions_pie_chart(company_name, energy_usage, waste, business_travel):
+    fig = go.Figure(
+        data=[
+            go.Pie(
+                labels=[
+                    "Energy Usage",
+                    "Waste Generated",
+                    "Business Travel",
+                ],
+                values=[
+                    energy_usage,
+                    waste,
+                    business_travel,
+                ],
+                hole=0.3,
+                marker=dict(colors=["#FF9800", "#4CAF50", "#2196F3"]),
+            )
+        ]
+    )
+
+    fig.update_layout(
+        title=f"Carbon Emissions Distribution - {company_name}",
+        annotations=[
+            dict(
+                text="Total kgCO2",
+                x=0.5,
+                y=0.5,
+                font_size=20,
+                showarrow=False,
+            )
+        ],
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+    )
+    return fig
+
 
 def user_view():
     st.markdown(
@@ -32,9 +71,38 @@ def user_view():
 
     # Initialize session state variables
     if 'companies_data' not in st.session_state:
-        st.session_state.companies_data = []
+        st.session_state.companies_data = empty_table()
+    # Only a full page run gets here, and it never shows results
+    st.session_state.results_shown = False
+
+    company_information()
+
+    # Create three columns for input sections
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        energy_usage_inputs()
+    with col2:
+        waste_inputs()
+    with col3:
+        business_travel_inputs()
+
+    carbon_footprint_results()
+
+
+def clear_results():
+    """Rerun the whole page if results are shown, so they disappear once an input changes.
+
+    Call it after the fragment's widgets: widgets a fragment run does not
+    reach are dropped from session state, losing the values just entered.
+    """
+    if st.session_state.get("results_shown"):
+        st.rerun(scope="app")
 
-    # Company Information
+
+# Each section is a fragment, so interacting with one of its widgets
+# reruns only that section instead of the whole page
+@st.fragment
+def company_information():
     with st.container():
         st.markdown("<div class='input-section'>", unsafe_allow_html=True)
         st.markdown(
@@ -43,86 +111,96 @@ def user_view():
             ),
             unsafe_allow_html=True,
         )
-        company_name = st.text_input(
+        st.text_input(
             "Company Name", key="company_name", help="Enter your company name"
         )
-        report_date = st.date_input("Report Date", datetime.datetime.now())
+        st.date_input("Report Date", datetime.datetime.now(), key="report_date")
         st.markdown("</div>", unsafe_allow_html=True)
+    clear_results()
 
-    # Create three columns for input sections
-    col1, col2, col3 = st.columns(3)
 
-    # Energy Usage Section
-    with col1:
-        st.markdown("<div class='input-section'>", unsafe_allow_html=True)
-        st.markdown(
-            label(icon="bolt.ring.closed", title="Energy Usage", is_subheader=True),
-            unsafe_allow_html=True,
-        )
-        st.session_state.electricity_bill = st.number_input(
-            "Monthly Electricity Bill (€)",
-            min_value=0.0,
-            help="Enter your average monthly electricity bill in euros",
-            key="electricity_bill_input"
-        )
-        st.session_state.natural_gas_bill = st.number_input(
-            "Monthly Natural Gas Bill (€)",
-            min_value=0.0,
-            help="Enter your average monthly natural gas bill in euros",
-            key="natural_gas_bill_input"
-        )
-        st.session_state.fuel_bill = st.number_input(
-            "Monthly Fuel Bill (€)",
-            min_value=0.0,
-            help="Enter your average monthly fuel bill for transportation in euros",
-            key="fuel_bill_input"
-        )
-        st.markdown("</div>", unsafe_allow_html=True)
+@st.fragment
+def energy_usage_inputs():
+    st.markdown("<div class='input-section'>", unsafe_allow_html=True)
+    st.markdown(
+        label(icon="bolt.ring.closed", title="Energy Usage", is_subheader=True),
+        unsafe_allow_html=True,
+    )
+    st.number_input(
+        "Monthly Electricity Bill (€)",
+        min_value=0.0,
+        help="Enter your average monthly electricity bill in euros",
+        key="electricity_bill_input"
+    )
+    st.number_input(
+        "Monthly Natural Gas Bill (€)",
+        min_value=0.0,
+        help="Enter your average monthly natural gas bill in euros",
+        key="natural_gas_bill_input"
+    )
+    st.number_input(
+        "Monthly Fuel Bill (€)",
+        min_value=0.0,
+        help="Enter your average monthly fuel bill for transportation in euros",
+        key="fuel_bill_input"
+    )
+    st.markdown("</div>", unsafe_allow_html=True)
+    clear_results()
 
-    # Waste Section
-    with col2:
-        st.markdown("<div class='input-section'>", unsafe_allow_html=True)
-        st.markdown(
-            label(icon="arrow.up.trash", title="Waste", is_subheader=True),
-            unsafe_allow_html=True,
-        )
-        st.session_state.waste_per_month = st.number_input(
-            "Monthly Waste Generated (kg)",
-            min_value=0.0,
-            help="Enter the amount of waste generated per month in kilograms",
-            key="waste_per_month_input"
-        )
-        st.session_state.recycling_percent = st.slider(
-            "Recycling Percentage",
-            min_value=0,
-            max_value=100,
-            value=30,
-            help="Percentage of waste that is recycled or composted",
-            key="recycling_percent_input"
-        )
-        st.markdown("</div>", unsafe_allow_html=True)
 
-    # Business Travel Section
-    with col3:
-        st.markdown("<div class='input-section'>", unsafe_allow_html=True)
-        st.markdown(
-            label(icon="airplane.circle", title="Business Travel", is_subheader=True),
-            unsafe_allow_html=True,
-        )
-        st.session_state.distance_km = st.number_input(
-            "Distance Traveled (km)",
-            min_value=0.0,
-            help="Enter the total distance traveled for business purposes in kilometers",
-            key="distance_km_input"
-        )
-        st.session_state.fuel_efficiency = st.number_input(
-            "Fuel Efficiency (L/100km)",
-            min_value=0.1,
-            value=8.0,
-            help="Enter the average fuel efficiency in liters per 100 kilometers",
-            key="fuel_efficiency_input"
-        )
-        st.markdown("</div>", unsafe_allow_html=True)
+@st.fragment
+def waste_inputs():
+    st.markdown("<div class='input-section'>", unsafe_allow_html=True)
+    st.markdown(
+        label(icon="arrow.up.trash", title="Waste", is_subheader=True),
+        unsafe_allow_html=True,
+    )
+    st.number_input(
+        "Monthly Waste Generated (kg)",
+        min_value=0.0,
+        help="Enter the amount of waste generated per month in kilograms",
+        key="waste_per_month_input"
+    )
+    st.slider(
+        "Recycling Percentage",
+        min_value=0,
+        max_value=100,
+        value=30,
+        help="Percentage of waste that is recycled or composted",
+        key="recycling_percent_input"
+    )
+    st.markdown("</div>", unsafe_allow_html=True)
+    clear_results()
+
+
+@st.fragment
+def business_travel_inputs():
+    st.markdown("<div class='input-section'>", unsafe_allow_html=True)
+    st.markdown(
+        label(icon="airplane.circle", title="Business Travel", is_subheader=True),
+        unsafe_allow_html=True,
+    )
+    st.number_input(
+        "Distance Traveled (km)",
+        min_value=0.0,
+        help="Enter the total distance traveled for business purposes in kilometers",
+        key="distance_km_input"
+    )
+    st.number_input(
+        "Fuel Efficiency (L/100km)",
+        min_value=0.1,
+        value=8.0,
+        help="Enter the average fuel efficiency in liters per 100 kilometers",
+        key="fuel_efficiency_input"
+    )
+    st.markdown("</div>", unsafe_allow_html=True)
+    clear_results()
+
+
+@st.fragment
+def carbon_footprint_results():
+    company_name = st.session_state.company_name
+    report_date = st.session_state.report_date
 
     # Calculate button
     if st.button("Calculate Carbon Footprint", key="calculate"):
@@ -135,17 +213,17 @@ def user_view():
         else:
             # Proceed with calculations
             CO2_from_energy_usage = calculate_CO2_from_energy_usage(
-                st.session_state.electricity_bill,
-                st.session_state.natural_gas_bill,
-                st.session_state.fuel_bill
+                st.session_state.electricity_bill_input,
+                st.session_state.natural_gas_bill_input,
+                st.session_state.fuel_bill_input
             )
             CO2_from_waste = calculate_CO2_from_waste(
-                st.session_state.waste_per_month,
-                st.session_state.recycling_percent
+                st.session_state.waste_per_month_input,
+                st.session_state.recycling_percent_input
             )
             CO2_from_business_travel = calculate_CO2_from_business_travel(
-                st.session_state.distance_km,
-                st.session_state.fuel_efficiency
+                st.session_state.distance_km_input,
+                st.session_state.fuel_efficiency_input
             )
 
             # Store data in session state
@@ -159,10 +237,22 @@ def user_view():
                 "total": CO2_from_energy_usage
                 + CO2_from_waste
                 + CO2_from_business_travel,
+                # Raw inputs, kept so the report can be recomputed when formulas change
+                "electricity_bill": st.session_state.electricity_bill_input,
+                "natural_gas_bill": st.session_state.natural_gas_bill_input,
+                "fuel_bill": st.session_state.fuel_bill_input,
+                "waste_per_month": st.session_state.waste_per_month_input,
+                "recycling_percent": st.session_state.recycling_percent_input,
+                "distance_km": st.session_state.distance_km_input,
+                "fuel_efficiency": st.session_state.fuel_efficiency_input,
+                "formula_version": FORMULA_VERSION,
             }
-            st.session_state.companies_data.append(report_data)
+            st.session_state.companies_data = append_report(
+                st.session_state.companies_data, report_data
+            )
 
             # Results section
+            st.session_state.results_shown = True
             st.markdown("<div class='results-section'>", unsafe_allow_html=True)
             st.markdown(
                 label(
@@ -177,39 +267,11 @@ def user_view():
             res_col1, res_col2 = st.columns([2, 1])
 
             with res_col1:
-                # Create pie chart using Plotly
-                fig = go.Figure(
-                    data=[
-                        go.Pie(
-                            labels=[
-                                "Energy Usage",
-                                "Waste Generated",
-                                "Business Travel",
-                            ],
-                            values=[
-                                CO2_from_energy_usage,
-                                CO2_from_waste,
-                                CO2_from_business_travel,
-                            ],
-                            hole=0.3,
-                            marker=dict(colors=["#FF9800", "#4CAF50", "#2196F3"]),
-                        )
-                    ]
-                )
-
-                fig.update_layout(
-                    title=f"Carbon Emissions Distribution - {company_name}",
-                    annotations=[
-                        dict(
-                            text="Total kgCO2",
-                            x=0.5,
-                            y=0.5,
-                            font_size=20,
-                            showarrow=False,
-                        )
-                    ],
-                    paper_bgcolor="rgba(0,0,0,0)",
-                    plot_bgcolor="rgba(0,0,0,0)",
+                fig = emissions_pie_chart(
+                    company_name,
+                    CO2_from_energy_usage,
+                    CO2_from_waste,
+                    CO2_from_business_travel,
                 )
 
                 st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': True})
@@ -274,11 +336,11 @@ def user_view():
                 CO2_from_energy_usage,
                 CO2_from_waste,
                 CO2_from_business_travel,
-                st.session_state.electricity_bill,
-                st.session_state.natural_gas_bill,
-                st.session_state.fuel_bill,
-                st.session_state.waste_per_month,
-                st.session_state.recycling_percent
+                st.session_state.electricity_bill_input,
+                st.session_state.natural_gas_bill_input,
+                st.session_state.fuel_bill_input,
+                st.session_state.waste_per_month_input,
+                st.session_state.recycling_percent_input
             )
             display_suggestions(company_name, suggestions)
 
@@ -11,28 +11,28 @@ def validate_inputs():
         error_messages.append("Please enter a company name.")
 
     # Energy Usage validation
-    if st.session_state.electricity_bill == 0:
+    if st.session_state.electricity_bill_input == 0:
         is_valid = False
         error_messages.append("Please enter the electricity bill.")
 
-    if st.session_state.natural_gas_bill == 0 and st.session_state.fuel_bill == 0:
+    if st.session_state.natural_gas_bill_input == 0 and st.session_state.fuel_bill_input == 0:
         is_valid = False
         error_messages.append("Please enter the natural gas bill.")
 
-    if st.session_state.fuel_bill == 0:
+    if st.session_state.fuel_bill_input == 0:
         is_valid = False
         error_messages.append("Please enter the fuel bill.")
     
     # Waste validation
-    if st.session_state.waste_per_month == 0:
+    if st.session_state.waste_per_month_input == 0:
         is_valid = False
         error_messages.append("Please enter the amount of waste generated.")
     
     # Business Travel validation
-    if st.session_state.distance_km == 0:
+    if st.session_state.distance_km_input == 0:
         is_valid = False
         error_messages.append("Please enter the distance traveled.")
-    if st.session_state.fuel_efficiency <= 0:
+    if st.session_state.fuel_efficiency_input <= 0:
         is_valid = False
         error_messages.append("Please enter a valid fuel efficiency value greater than 0.")
         
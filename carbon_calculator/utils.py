@@ -1,13 +1,19 @@
 import streamlit as st
 
 from io import BytesIO
+from functools import lru_cache
 import base64
 
+from carbon_calculator.assets import icon_src
+from carbon_calculator.report_table import table_to_csv
+
+# Labels are static HTML, build each one once per process
+@lru_cache(maxsize=None)
 def label(icon: str, title: str, is_subheader: bool = False) -> str:
     icon_class = "custom-icon-sub-header" if is_subheader else "custom-icon-header"
     return f"""
     {'<h3>' if is_subheader else '<h1>'}
-        <img class='{icon_class}' src='https://raw.githubusercontent.com/eshagarwal/Carbon-Reporting-Project/main/Icons/{icon}.png'/>
+        <img class='{icon_class}' src='{icon_src(icon)}'/>
         {title}
     {'</h3>' if is_subheader else '</h1>'}
 """
@@ -19,7 +25,7 @@ def get_image_download_link(fig, filename, icon, text):
     buf.seek(0)
     b64 = base64.b64encode(buf.read()).decode()
     href = f"""
-    <img style="height: 20px; width: auto" src='https://raw.githubusercontent.com/eshagarwal/Carbon-Reporting-Project/main/Icons/{icon}.png'/>
+    <img style="height: 20px; width: auto" src='{icon_src(icon)}'/>
     <a href="data:application/pdf;base64,{b64}" download="{filename}.pdf">
         {text}
     </a>
@@ -30,18 +36,18 @@ def get_csv_download_link(df, filename, icon, text):
     csv = df.to_csv(index=False)
     b64 = base64.b64encode(csv.encode()).decode()
     href = f"""
-    <img style="height: 20px; width: auto" src='https://raw.githubusercontent.com/eshagarwal/Carbon-Reporting-Project/main/Icons/{icon}.png'/>
+    <img style="height: 20px; width: auto" src='{icon_src(icon)}'/>
     <a href="data:application/pdf;base64,{b64}" download="{filename}">
         {text}
     </a>
     """
     return href
 
-def download_data_button(df):
-    csv = df.to_csv(index=False)
+def download_data_button(table):
+    csv = table_to_csv(table)
     b64 = base64.b64encode(csv.encode()).decode()
     href = f"""
-    <img style="height: 20px; width: auto" src='https://raw.githubusercontent.com/eshagarwal/Carbon-Reporting-Project/main/Icons/square.and.arrow.down.png'/>
+    <img style="height: 20px; width: auto" src='{icon_src("square.and.arrow.down")}'/>
     <a href="data:file/csv;base64,{b64}" download="complete_carbon_footprint_data.csv">
     Click here to download the complete dataset
     </a>